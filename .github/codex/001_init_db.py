@@ -5,6 +5,7 @@ MUST HAVE REQUIREMENTS:
 - Create DB at path specified by --db argument
 - Read GITHUB_CONTEXT, GITHUB_TOKEN, CODEX_CONFIG, PR_NUMBER from env
 - Insert all config into DB
+- AWS/SSH keys in CODEX_CONFIG are only required for the ec2 backend
 """
 
 import sqlite3, json, sys, os
@@ -49,6 +50,37 @@ cursor.execute("""
     )
 """)
 
+# ---------------------------------------------------------------------------
+# Run accounting tables (see accounting.py, exported by 010_export_accounting.py)
+# ---------------------------------------------------------------------------
+
+cursor.execute("""
+    CREATE TABLE IF NOT EXISTS stages (
+        stage TEXT,
+        kind TEXT,
+        started_at REAL,
+        ended_at REAL,
+        returncode INTEGER
+    )
+""")
+
+cursor.execute("""
+    CREATE TABLE IF NOT EXISTS transfers (
+        stage TEXT,
+        direction TEXT,
+        bytes INTEGER
+    )
+""")
+
+cursor.execute("""
+    CREATE TABLE IF NOT EXISTS usage_samples (
+        sampled_at INTEGER,
+        cpu_pct REAL,
+        mem_used_mb REAL,
+        mem_total_mb REAL
+    )
+""")
+
 cursor.execute("INSERT INTO dumps VALUES ('json', 'github', ?)", (json.dumps(github_context),))
 cursor.execute("INSERT INTO dumps VALUES ('secret', 'github_token', ?)", (github_token,))
 
@@ -59,20 +91,43 @@ cursor.execute("INSERT INTO dumps VALUES ('secret', 'github_token', ?)", (github
 repo_name = github_context["repository"].split("/")[1]
 workdir = f"/home/ubuntu/{repo_name}/{pr_number}"
 
+# ---------------------------------------------------------------------------
+# Optional settings: codex invocation, payload delivery ("ssh" or "user_data"),
+# execution backend ("ec2", "local" or "auto", see backends.py), debug session lease
+# ---------------------------------------------------------------------------
+
+codex_exec = codex_config.get("codex_exec", "codex exec -m gpt-5.2-codex --config model_reasoning_effort=high --dangerously-bypass-approvals-and-sandbox --skip-git-repo-check")
+payload_delivery = codex_config.get("payload_delivery", "ssh")
+backend = codex_config.get("backend", "ec2")
+local_max_diff_lines = str(codex_config.get("local_max_diff_lines", 200))
+local_container_image = codex_config.get("local_container_image")
+codex_timeout_minutes = str(codex_config.get("codex_timeout_minutes", 120))
+debug_idle_minutes = str(codex_config.get("debug_idle_minutes", 30))
+debug_max_minutes = str(codex_config.get("debug_max_minutes", 350))
+
 config_values = [
+    ("run_id", f"{github_context.get('run_id', '')}-{github_context.get('run_attempt', '')}"),
     ("workdir", workdir),
     ("pr_number", pr_number),
     ("repo", github_context["repository"]),
     ("repo_name", repo_name),
-    ("ami_id", codex_config["ami_id"]),
-    ("instance_type", codex_config["instance_type"]),
-    ("key_name", codex_config["key_name"]),
-    ("security_group_id", codex_config["security_group_id"]),
-    ("region", codex_config["region"]),
-    ("ssh_private_key", codex_config["ssh_private_key"]),
-    ("aws_access_key_id", codex_config["aws_access_key_id"]),
-    ("aws_secret_access_key", codex_config["aws_secret_access_key"]),
+    ("ami_id", codex_config.get("ami_id")),
+    ("instance_type", codex_config.get("instance_type")),
+    ("key_name", codex_config.get("key_name")),
+    ("security_group_id", codex_config.get("security_group_id")),
+    ("region", codex_config.get("region")),
+    ("ssh_private_key", codex_config.get("ssh_private_key")),
+    ("aws_access_key_id", codex_config.get("aws_access_key_id")),
+    ("aws_secret_access_key", codex_config.get("aws_secret_access_key")),
     ("codex_auth_json", codex_config["codex_auth_json"]),
+    ("codex_exec", codex_exec),
+    ("payload_delivery", payload_delivery),
+    ("backend", backend),
+    ("local_max_diff_lines", local_max_diff_lines),
+    ("local_container_image", local_container_image),
+    ("codex_timeout_minutes", codex_timeout_minutes),
+    ("debug_idle_minutes", debug_idle_minutes),
+    ("debug_max_minutes", debug_max_minutes),
 ]
 
 cursor.executemany("INSERT INTO config (key, value) VALUES (?, ?)", config_values)
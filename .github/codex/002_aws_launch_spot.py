@@ -5,17 +5,34 @@ MUST HAVE REQUIREMENTS:
 - Read config from DB (ami_id, instance_type, key_name, security_group_id, region, aws creds)
 - Launch spot instance
 - Wait for instance to be running
-- Write instance_id and public_ip back to DB
+- Write instance_id, public_ip and launched_at (accounting) back to DB
+
+OPTIONAL (--user-data, needs 004/005 to have run and codex-boot-hook baked into the AMI):
+- Embed AGENTS.md, prompt.txt and auth.json as gzip+base64 user data
+- With --autostart the boot hook also starts codex in workdir
+- Wait for the boot hook to report on the console output, write boot_hook_status to DB
+
+SECURITY (--user-data): auth.json and the GitHub token (in AGENTS.md/prompt.txt) travel in user
+data. The boot hook deletes cloud-init's on-disk copies, but IMDS still serves the payload to any
+process on the instance (codex runs with passwordless sudo and holds the same files anyway), and
+DescribeInstanceAttribute(userData) returns it to anyone with that EC2 permission until the
+instance terminates. Keep that permission restricted to the pipeline's IAM user.
+
+Usage: uv run 002_aws_launch_spot.py --db db.sqlite3 [--user-data [--autostart]]
 """
 
-import boto3, sqlite3, sys, time
+import boto3, sqlite3, sys, time, json, gzip, base64
 from pathlib import Path
+from jinja2 import Template
+from accounting import record_transfer, sampled_cmd
 
 # ---------------------------------------------------------------------------
 # DB path from command line: --db <path>
 # ---------------------------------------------------------------------------
 
 db_path = Path(sys.argv[2])
+use_user_data = "--user-data" in sys.argv[3:]
+autostart = "--autostart" in sys.argv[3:]
 
 # ---------------------------------------------------------------------------
 # Read config from DB
@@ -27,6 +44,33 @@ cursor = conn.cursor()
 cursor.execute("SELECT key, value FROM config WHERE key IN ('ami_id', 'instance_type', 'key_name', 'security_group_id', 'region', 'aws_access_key_id', 'aws_secret_access_key')")
 config = dict(cursor.fetchall())
 
+# ---------------------------------------------------------------------------
+# Build user data payload (EC2 limits user data to 16 KB)
+# ---------------------------------------------------------------------------
+
+launch_extra = {}
+if use_user_data:
+    cursor.execute("SELECT key, value FROM config WHERE key IN ('workdir', 'agents_md', 'prompt', 'codex_auth_json', 'codex_exec')")
+    payload_config = dict(cursor.fetchall())
+    workdir = payload_config["workdir"]
+
+    payload = {
+        "workdir": workdir,
+        "files": {
+            f"{workdir}/AGENTS.md": payload_config["agents_md"],
+            f"{workdir}/prompt.txt": payload_config["prompt"],
+            "/home/ubuntu/.codex/auth.json": payload_config["codex_auth_json"],
+        },
+        "run": sampled_cmd(workdir, f"cat prompt.txt | {payload_config['codex_exec']}") if autostart else None,
+    }
+    encoded = base64.b64encode(gzip.compress(json.dumps(payload).encode())).decode()
+    user_data = Template(Path("templates/user_data.sh.j2").read_text()).render(payload=encoded)
+    if len(user_data.encode()) > 16384:
+        raise SystemExit(f"User data is {len(user_data.encode())} bytes, EC2 limit is 16384")
+
+    launch_extra["UserData"] = user_data
+    print(f"Embedding payload as user data ({len(user_data.encode())} bytes, autostart={autostart})")
+
 # ---------------------------------------------------------------------------
 # Launch spot instance
 # ---------------------------------------------------------------------------
@@ -45,12 +89,17 @@ response = ec2.run_instances(
     SecurityGroupIds=[config["security_group_id"]],
     MinCount=1,
     MaxCount=1,
-    InstanceMarketOptions={"MarketType": "spot", "SpotOptions": {"SpotInstanceType": "one-time"}}
+    InstanceMarketOptions={"MarketType": "spot", "SpotOptions": {"SpotInstanceType": "one-time"}},
+    **launch_extra
 )
 
 instance_id = response["Instances"][0]["InstanceId"]
+launched_at = response["Instances"][0]["LaunchTime"].timestamp()
 print(f"Launched spot instance: {instance_id}")
 
+if use_user_data:
+    record_transfer(db_path, "002_aws_launch_spot.py", "up", len(user_data.encode()))
+
 # ---------------------------------------------------------------------------
 # Wait for running state
 # ---------------------------------------------------------------------------
@@ -74,7 +123,35 @@ print(f"Public IP: {public_ip}")
 
 cursor.execute("INSERT OR REPLACE INTO config (key, value) VALUES ('instance_id', ?)", (instance_id,))
 cursor.execute("INSERT OR REPLACE INTO config (key, value) VALUES ('public_ip', ?)", (public_ip,))
+cursor.execute("INSERT OR REPLACE INTO config (key, value) VALUES ('launched_at', ?)", (str(launched_at),))
 conn.commit()
+
+# ---------------------------------------------------------------------------
+# Wait for boot hook report (console output, Latest=True needs a Nitro instance type)
+# ---------------------------------------------------------------------------
+
+if use_user_data:
+    expected = "started" if autostart else "unpacked"
+    print(f"Waiting for boot hook to report '{expected}'...")
+    # Scan every report, not just the last: a fast codex exit shows "finished N" by the first
+    # poll, which still counts as started (007 reads the exit code)
+    statuses = []
+    for i in range(60):
+        output = ec2.get_console_output(InstanceId=instance_id, Latest=True).get("Output", "")
+        statuses = [line.split("CODEX_BOOT_HOOK ")[1].split()[0] for line in output.splitlines() if "CODEX_BOOT_HOOK " in line]
+        reached = expected in statuses or (autostart and "finished" in statuses)
+        if reached or "failed" in statuses:
+            break
+        print(f"Attempt {i+1}/60...")
+        time.sleep(5)
+
+    print(f"Boot hook reports: {' '.join(statuses) or 'none'}")
+    if not reached:
+        raise SystemExit(f"Boot hook did not report '{expected}'")
+    boot_hook_status = expected
+
+    cursor.execute("INSERT OR REPLACE INTO config (key, value) VALUES ('boot_hook_status', ?)", (boot_hook_status,))
+    conn.commit()
 conn.close()
 
 print("Instance info written to DB")
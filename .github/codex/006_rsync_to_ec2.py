@@ -6,10 +6,12 @@ MUST HAVE REQUIREMENTS:
 - Create remote workdir and ~/.codex/ via SSH
 - Upload AGENTS.md and prompt.txt to workdir
 - Upload auth.json to /home/ubuntu/.codex/auth.json
+- Record bytes sent (rsync --stats) for accounting
 """
 
-import sqlite3, subprocess, tempfile, os, sys
+import sqlite3, subprocess, tempfile, os, sys, re
 from pathlib import Path
+from accounting import record_transfer
 
 # ---------------------------------------------------------------------------
 # Paths (relative, script runs from .github/codex/)
@@ -60,24 +62,29 @@ with open(auth_json_path, "w") as f:
 # Rsync files to EC2
 # ---------------------------------------------------------------------------
 
+def rsync(local_file, remote_path):
+    result = subprocess.run(
+        ["rsync", "-avz", "--stats", "-e", f"ssh {' '.join(ssh_opts)}",
+         str(local_file), f"{remote_host}:{remote_path}"],
+        capture_output=True, text=True, check=True
+    )
+    print(result.stdout)
+    sent = re.search(r"Total bytes sent: ([\d,]+)", result.stdout)
+    return int(sent.group(1).replace(",", "")) if sent else 0
+
+bytes_sent = 0
+
 print(f"Syncing AGENTS.md and prompt.txt to {config['public_ip']}:{config['workdir']}")
 for local_file in [local_tmp / "AGENTS.md", local_tmp / "prompt.txt"]:
-    subprocess.run(
-        ["rsync", "-avz", "-e", f"ssh {' '.join(ssh_opts)}",
-         str(local_file), f"{remote_host}:{config['workdir']}/"],
-        check=True
-    )
+    bytes_sent += rsync(local_file, f"{config['workdir']}/")
 
 # ---------------------------------------------------------------------------
 # Rsync auth.json to ~/.codex/
 # ---------------------------------------------------------------------------
 
 print(f"Syncing auth.json to {config['public_ip']}:~/.codex/")
-subprocess.run(
-    ["rsync", "-avz", "-e", f"ssh {' '.join(ssh_opts)}",
-     str(auth_json_path), f"{remote_host}:/home/ubuntu/.codex/auth.json"],
-    check=True
-)
+bytes_sent += rsync(auth_json_path, "/home/ubuntu/.codex/auth.json")
 
+record_transfer(db_path, "006_rsync_to_ec2.py", "up", bytes_sent)
 os.unlink(key_path)
 print("Rsync complete")
@@ -2,12 +2,17 @@
 Run codex on remote host.
 
 MUST HAVE REQUIREMENTS:
-- Read public_ip, ssh_private_key, workdir, prompt from DB
+- Read public_ip, ssh_private_key, workdir, codex_exec from DB
 - Execute codex via SSH in workdir
+- Sample remote CPU/memory to workdir/usage.log during the run, store in usage_samples
+- If the boot hook already started codex (boot_hook_status = started), wait for its
+  "finished" console report instead and print workdir/codex.log; fail on a "failed" report,
+  when the instance leaves the running state, or after codex_timeout_minutes
 """
 
-import sqlite3, subprocess, tempfile, os, sys
+import boto3, sqlite3, subprocess, tempfile, os, sys, time
 from pathlib import Path
+from accounting import sampled_cmd, record_usage
 
 # ---------------------------------------------------------------------------
 # DB path from command line: --db <path>
@@ -22,7 +27,7 @@ db_path = Path(sys.argv[2])
 conn = sqlite3.connect(db_path)
 cursor = conn.cursor()
 
-cursor.execute("SELECT key, value FROM config WHERE key IN ('public_ip', 'ssh_private_key', 'workdir', 'prompt')")
+cursor.execute("SELECT key, value FROM config WHERE key IN ('public_ip', 'ssh_private_key', 'workdir', 'codex_exec', 'boot_hook_status', 'instance_id', 'region', 'aws_access_key_id', 'aws_secret_access_key', 'codex_timeout_minutes')")
 config = dict(cursor.fetchall())
 conn.close()
 
@@ -35,20 +40,68 @@ os.write(key_fd, config["ssh_private_key"].encode())
 os.close(key_fd)
 os.chmod(key_path, 0o600)
 
+# ---------------------------------------------------------------------------
+# Codex started at boot: wait for the boot hook to report completion
+# ---------------------------------------------------------------------------
+
+ssh_cmd = ["ssh", "-o", "StrictHostKeyChecking=no", "-i", key_path, f"ubuntu@{config['public_ip']}"]
+
+if config.get("boot_hook_status") == "started":
+    ec2 = boto3.client(
+        "ec2",
+        region_name=config["region"],
+        aws_access_key_id=config["aws_access_key_id"],
+        aws_secret_access_key=config["aws_secret_access_key"]
+    )
+
+    print(f"Waiting for codex started at boot in {config['workdir']}...")
+    deadline = time.time() + int(config.get("codex_timeout_minutes") or 120) * 60
+    returncode = None
+    while returncode is None:
+        time.sleep(15)
+
+        # Spot reclaim or a crashed instance will never report back
+        desc = ec2.describe_instances(InstanceIds=[config["instance_id"]])
+        state = desc["Reservations"][0]["Instances"][0]["State"]["Name"]
+        if state != "running":
+            os.unlink(key_path)
+            raise SystemExit(f"Instance is {state}, codex did not finish")
+
+        output = ec2.get_console_output(InstanceId=config["instance_id"], Latest=True).get("Output", "")
+        for line in output.splitlines():
+            if "CODEX_BOOT_HOOK finished " in line:
+                returncode = int(line.split("CODEX_BOOT_HOOK finished ")[1].split()[0])
+            elif "CODEX_BOOT_HOOK failed" in line:
+                returncode = -1
+
+        if returncode is None and time.time() > deadline:
+            os.unlink(key_path)
+            raise SystemExit(f"Codex did not finish within {config.get('codex_timeout_minutes') or 120} minutes")
+
+    result = subprocess.run(ssh_cmd + [f"cat {config['workdir']}/codex.log"], capture_output=True, text=True)
+    print(f"CODEX LOG:\n{result.stdout}")
+    usage = subprocess.run(ssh_cmd + [f"cat {config['workdir']}/usage.log"], capture_output=True, text=True)
+    print(f"Usage samples: {record_usage(db_path, usage.stdout)}")
+    os.unlink(key_path)
+    if returncode != 0:
+        raise SystemExit(f"Codex failed with exit code {returncode}")
+    print("Codex execution complete")
+    exit(0)
+
 # ---------------------------------------------------------------------------
 # Run codex in workdir
 # ---------------------------------------------------------------------------
 
-codex_cmd = f"cd {config['workdir']} && cat prompt.txt | codex exec -m gpt-5.2-codex --config model_reasoning_effort=high --dangerously-bypass-approvals-and-sandbox --skip-git-repo-check"
+codex_cmd = sampled_cmd(config["workdir"], f"cat prompt.txt | {config['codex_exec']}")
 
 print(f"Running codex in {config['workdir']}...")
-result = subprocess.run(
-    ["ssh", "-o", "StrictHostKeyChecking=no", "-i", key_path,
-     f"ubuntu@{config['public_ip']}", codex_cmd],
-    capture_output=True, text=True
-)
+result = subprocess.run(ssh_cmd + [codex_cmd], capture_output=True, text=True)
 print(f"STDOUT:\n{result.stdout}")
 print(f"STDERR:\n{result.stderr}")
+
+usage = subprocess.run(ssh_cmd + [f"cat {config['workdir']}/usage.log"], capture_output=True, text=True)
+print(f"Usage samples: {record_usage(db_path, usage.stdout)}")
+
 if result.returncode != 0:
     raise SystemExit(f"Codex failed with exit code {result.returncode}")
 
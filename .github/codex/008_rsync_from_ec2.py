@@ -3,20 +3,38 @@ Download files from EC2 for local testing.
 
 MUST HAVE REQUIREMENTS:
 - Read ssh_private_key, public_ip, workdir from DB
-- Download workdir from EC2
-- Save to tmp/
+- Build a manifest of workdir on the remote (path, size, sha256)
+- Filter with --include/--exclude patterns (matching a path or any directory above it)
+  or --outputs-only (top-level review outputs, no repo clone); symlinks are not downloaded
+- Skip files already in tmp/ with the same hash
+- Stream the remaining files as one compressed tar over a single SSH connection
+- Save to tmp/ and store the manifest in DB
+- Record bytes received for accounting
 
-Usage: uv run 008_rsync_from_ec2.py --db db.sqlite3
+Usage: uv run 008_rsync_from_ec2.py --db db.sqlite3 [--outputs-only] [--include PAT] [--exclude PAT] [--list]
 """
 
-import subprocess, tempfile, os, sys, sqlite3
+import argparse, hashlib, json, shlex, subprocess, tempfile, os, sqlite3, threading
 from pathlib import Path
+from accounting import record_transfer
+
+# ---------------------------------------------------------------------------
+# Arguments (patterns match paths relative to workdir, e.g. "*.md", "myrepo")
+# ---------------------------------------------------------------------------
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--db", required=True)
+parser.add_argument("--include", action="append", default=[], help="only download paths matching this pattern")
+parser.add_argument("--exclude", action="append", default=[], help="skip paths (or whole directories) matching this pattern")
+parser.add_argument("--outputs-only", action="store_true", help="only top-level files of workdir, not the repo clone")
+parser.add_argument("--list", action="store_true", help="print the manifest without downloading")
+args = parser.parse_args()
 
 # ---------------------------------------------------------------------------
 # Paths (relative, script runs from .github/codex/)
 # ---------------------------------------------------------------------------
 
-db_path = Path(sys.argv[2])
+db_path = Path(args.db)
 local_dir = Path("tmp")
 local_dir.mkdir(exist_ok=True)
 
@@ -29,7 +47,6 @@ cursor = conn.cursor()
 
 cursor.execute("SELECT key, value FROM config WHERE key IN ('public_ip', 'ssh_private_key', 'workdir')")
 config = dict(cursor.fetchall())
-conn.close()
 
 # ---------------------------------------------------------------------------
 # Write key to temp file
@@ -41,18 +58,134 @@ os.close(key_fd)
 os.chmod(key_path, 0o600)
 
 # ---------------------------------------------------------------------------
-# Download workdir from EC2
+# SSH connection sharing: manifest and transfer reuse one connection
 # ---------------------------------------------------------------------------
 
 remote_host = f"ubuntu@{config['public_ip']}"
-ssh_opts = ["-o", "StrictHostKeyChecking=no", "-i", key_path]
+control_path = f"{key_path}.ctl"
+ssh_opts = ["-o", "StrictHostKeyChecking=no", "-i", key_path,
+            "-o", "ControlMaster=auto", "-o", f"ControlPath={control_path}", "-o", "ControlPersist=60"]
+
+# ---------------------------------------------------------------------------
+# Build manifest on the remote (filtering happens there, so excluded trees are never hashed)
+# ---------------------------------------------------------------------------
 
-print(f"Downloading {config['workdir']} from {config['public_ip']}...")
-subprocess.run(
-    ["rsync", "-avz", "-e", f"ssh {' '.join(ssh_opts)}",
-     f"{remote_host}:{config['workdir']}/", str(local_dir) + "/"],
-    check=True
+manifest_script = r'''
+import hashlib, json, os, sys
+from fnmatch import fnmatch
+
+workdir, spec = sys.argv[1], json.loads(sys.argv[2])
+
+def matches(rel, patterns):
+    # A pattern matches the path itself or any directory above it ("myrepo" covers myrepo/x.py)
+    parts = rel.split("/")
+    return any(fnmatch("/".join(parts[:i]), p) for i in range(1, len(parts) + 1) for p in patterns)
+
+def wanted(rel):
+    if matches(rel, spec["exclude"]):
+        return False
+    return not spec["include"] or matches(rel, spec["include"])
+
+for root, dirs, files in os.walk(workdir):
+    rel_root = os.path.relpath(root, workdir)
+    rel_root = "" if rel_root == "." else rel_root + "/"
+    if spec["outputs_only"]:
+        dirs[:] = []
+    dirs[:] = [d for d in dirs if not any(fnmatch(rel_root + d, p) for p in spec["exclude"])]
+    for name in files:
+        rel = rel_root + name
+        full = os.path.join(root, name)
+        # Symlinks are skipped: tar would store the link, not the target hashed here
+        if not wanted(rel) or os.path.islink(full) or not os.path.isfile(full):
+            continue
+        sha = hashlib.sha256()
+        with open(full, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        print(json.dumps({"path": rel, "size": os.path.getsize(full), "sha256": sha.hexdigest()}))
+'''
+
+spec = {"include": args.include, "exclude": args.exclude, "outputs_only": args.outputs_only}
+manifest_cmd = f"python3 - {shlex.quote(config['workdir'])} {shlex.quote(json.dumps(spec))}"
+
+print(f"Building manifest of {config['workdir']} on {config['public_ip']}...")
+result = subprocess.run(
+    ["ssh"] + ssh_opts + [remote_host, manifest_cmd],
+    input=manifest_script, capture_output=True, text=True, check=True
 )
+manifest = [json.loads(line) for line in result.stdout.splitlines() if line]
+bytes_received = len(result.stdout.encode())
+
+cursor.execute("DELETE FROM dumps WHERE category = 'json' AND name = 'artifact_manifest'")
+cursor.execute("INSERT INTO dumps VALUES ('json', 'artifact_manifest', ?)", (json.dumps(manifest),))
+conn.commit()
+conn.close()
+
+# ---------------------------------------------------------------------------
+# Skip files already present locally with the same hash
+# ---------------------------------------------------------------------------
+
+def local_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+to_fetch = []
+for entry in manifest:
+    local_file = local_dir / entry["path"]
+    up_to_date = (local_file.is_file() and local_file.stat().st_size == entry["size"]
+                  and local_sha256(local_file) == entry["sha256"])
+    if not up_to_date:
+        to_fetch.append(entry)
+    if args.list:
+        print(f"{'ok     ' if up_to_date else 'fetch  '}{entry['size']:>12}  {entry['sha256'][:12]}  {entry['path']}")
+
+fetch_bytes = sum(entry["size"] for entry in to_fetch)
+print(f"Manifest: {len(manifest)} files, {len(to_fetch)} to fetch ({fetch_bytes} bytes)")
+
+# ---------------------------------------------------------------------------
+# Stream selected files as one compressed tar
+# ---------------------------------------------------------------------------
+
+if to_fetch and not args.list:
+    file_list = b"".join(entry["path"].encode() + b"\0" for entry in to_fetch)
+    remote_tar = subprocess.Popen(
+        ["ssh"] + ssh_opts + [remote_host, f"tar -czf - -C {shlex.quote(config['workdir'])} --null -T -"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+    local_tar = subprocess.Popen(["tar", "-xzf", "-", "-C", str(local_dir)], stdin=subprocess.PIPE)
+
+    def send_file_list():
+        try:
+            remote_tar.stdin.write(file_list)
+            remote_tar.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    # File list goes in from a thread while we relay the stream and count compressed bytes;
+    # if local tar dies mid-stream, stop the remote side and fail on the exit codes below
+    sender = threading.Thread(target=send_file_list)
+    sender.start()
+    try:
+        for block in iter(lambda: remote_tar.stdout.read(1 << 16), b""):
+            bytes_received += len(block)
+            local_tar.stdin.write(block)
+        local_tar.stdin.close()
+    except BrokenPipeError:
+        remote_tar.terminate()
+    sender.join()
+    if local_tar.wait() != 0 or remote_tar.wait() != 0:
+        subprocess.run(["ssh", "-o", f"ControlPath={control_path}", "-O", "exit", remote_host], capture_output=True)
+        os.unlink(key_path)
+        raise SystemExit("Artifact transfer failed")
+
+    changed = [e["path"] for e in to_fetch if local_sha256(local_dir / e["path"]) != e["sha256"]]
+    if changed:
+        print(f"Warning: {len(changed)} files changed on remote during download: {', '.join(changed)}")
 
+record_transfer(db_path, "008_rsync_from_ec2.py", "down", bytes_received)
+subprocess.run(["ssh", "-o", f"ControlPath={control_path}", "-O", "exit", remote_host], capture_output=True)
 os.unlink(key_path)
 print(f"Downloaded to: {local_dir}")
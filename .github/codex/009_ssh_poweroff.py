@@ -2,11 +2,15 @@
 Power off EC2 instance via SSH.
 
 MUST HAVE REQUIREMENTS:
-- Read public_ip, ssh_private_key from DB
+- Read public_ip, ssh_private_key, instance_id, region, aws creds from DB
 - Execute poweroff command via SSH
+- Confirm with describe_instances that the instance is going down; terminate it through
+  the EC2 API if it is not (ssh exits 255 both on poweroff and when the host is unreachable)
+- Exit 0 without an instance (local backend) or when already confirmed powered off
+- Write powered_off_at (first confirmed poweroff only) for accounting
 """
 
-import sqlite3, subprocess, tempfile, os, sys
+import boto3, sqlite3, subprocess, tempfile, os, sys, time
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -22,10 +26,20 @@ db_path = Path(sys.argv[2])
 conn = sqlite3.connect(db_path)
 cursor = conn.cursor()
 
-cursor.execute("SELECT key, value FROM config WHERE key IN ('public_ip', 'ssh_private_key')")
+cursor.execute("SELECT key, value FROM config WHERE key IN ('public_ip', 'ssh_private_key', 'powered_off_at', 'instance_id', 'region', 'aws_access_key_id', 'aws_secret_access_key')")
 config = dict(cursor.fetchall())
 conn.close()
 
+# Nothing launched (local backend, or launch failed before writing instance_id)
+if not config.get("instance_id"):
+    print("No instance to power off")
+    exit(0)
+
+# Already confirmed going down (pipeline teardown runs before the workflow's always() step)
+if config.get("powered_off_at"):
+    print("Instance already powered off")
+    exit(0)
+
 # ---------------------------------------------------------------------------
 # Write key to temp file
 # ---------------------------------------------------------------------------
@@ -41,10 +55,49 @@ os.chmod(key_path, 0o600)
 
 print(f"Powering off {config['public_ip']}...")
 subprocess.run(
-    ["ssh", "-o", "StrictHostKeyChecking=no", "-i", key_path,
+    ["ssh", "-o", "StrictHostKeyChecking=no", "-o", "ConnectTimeout=10", "-i", key_path,
      f"ubuntu@{config['public_ip']}", "sudo poweroff"],
     check=False  # poweroff may disconnect before returning
 )
 
 os.unlink(key_path)
-print("Poweroff command sent")
+
+# ---------------------------------------------------------------------------
+# Confirm via EC2 API, terminate if poweroff did not take
+# ---------------------------------------------------------------------------
+
+ec2 = boto3.client(
+    "ec2",
+    region_name=config["region"],
+    aws_access_key_id=config["aws_access_key_id"],
+    aws_secret_access_key=config["aws_secret_access_key"]
+)
+
+down_states = ("shutting-down", "terminated", "stopping", "stopped")
+
+def instance_state():
+    desc = ec2.describe_instances(InstanceIds=[config["instance_id"]])
+    return desc["Reservations"][0]["Instances"][0]["State"]["Name"]
+
+state = instance_state()
+for i in range(12):
+    if state in down_states:
+        break
+    print(f"Instance is {state}, attempt {i+1}/12...")
+    time.sleep(5)
+    state = instance_state()
+
+if state not in down_states:
+    print(f"Instance still {state} after poweroff, terminating {config['instance_id']}")
+    ec2.terminate_instances(InstanceIds=[config["instance_id"]])
+    state = instance_state()
+
+if state not in down_states:
+    raise SystemExit(f"Instance {config['instance_id']} is still {state}")
+
+conn = sqlite3.connect(db_path)
+conn.execute("INSERT OR IGNORE INTO config (key, value) VALUES ('powered_off_at', ?)", (str(time.time()),))
+conn.commit()
+conn.close()
+
+print(f"Instance is {state}")
@@ -0,0 +1,87 @@
+"""
+Export run accounting from DB to tmp/accounting.json.
+
+MUST HAVE REQUIREMENTS:
+- Read non-secret run config, stages, transfers, usage_samples from DB
+- Summarize: instance lifetime (launched_at → powered_off_at), busy/idle/local/session
+  seconds, idle instance time, utilization, bytes up/down, remote CPU and memory
+- Write tmp/accounting.json (uploaded as workflow artifact, input to accounting_report.py)
+- Store summary in DB
+"""
+
+import sqlite3, json, sys
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Paths (relative, script runs from .github/codex/)
+# ---------------------------------------------------------------------------
+
+db_path = Path(sys.argv[2])
+local_accounting_path = Path("tmp/accounting.json")
+local_accounting_path.parent.mkdir(exist_ok=True)
+
+# ---------------------------------------------------------------------------
+# Read from database (no secrets: only these config keys leave the runner)
+# ---------------------------------------------------------------------------
+
+conn = sqlite3.connect(db_path)
+
+cursor = conn.execute("SELECT key, value FROM config WHERE key IN ('run_id', 'repo', 'pr_number', 'instance_type', 'region', 'selected_backend', 'payload_delivery', 'instance_id', 'launched_at', 'powered_off_at', 'debug_end_reason')")
+run = dict(cursor.fetchall())
+
+cursor = conn.execute("SELECT stage, kind, started_at, ended_at, returncode FROM stages ORDER BY started_at")
+stages = [
+    {"stage": stage, "kind": kind, "started_at": started_at, "seconds": ended_at - started_at, "returncode": returncode}
+    for stage, kind, started_at, ended_at, returncode in cursor.fetchall()
+]
+
+cursor = conn.execute("SELECT stage, direction, bytes FROM transfers")
+transfers = [{"stage": stage, "direction": direction, "bytes": n_bytes} for stage, direction, n_bytes in cursor.fetchall()]
+
+cursor = conn.execute("SELECT sampled_at, cpu_pct, mem_used_mb, mem_total_mb FROM usage_samples ORDER BY sampled_at")
+usage_samples = [
+    {"sampled_at": sampled_at, "cpu_pct": cpu_pct, "mem_used_mb": mem_used_mb, "mem_total_mb": mem_total_mb}
+    for sampled_at, cpu_pct, mem_used_mb, mem_total_mb in cursor.fetchall()
+]
+
+# ---------------------------------------------------------------------------
+# Summarize
+# ---------------------------------------------------------------------------
+
+seconds_by_kind = {kind: sum(s["seconds"] for s in stages if s["kind"] == kind) for kind in ("busy", "idle", "local", "session")}
+
+instance_seconds = None
+if run.get("launched_at") and run.get("powered_off_at"):
+    instance_seconds = float(run["powered_off_at"]) - float(run["launched_at"])
+
+summary = {
+    "instance_seconds": instance_seconds,
+    "busy_seconds": seconds_by_kind["busy"],
+    "idle_seconds": seconds_by_kind["idle"],
+    "local_seconds": seconds_by_kind["local"],
+    "session_seconds": seconds_by_kind["session"],
+    # Everything the instance was up without codex running: boot, SSH wait, uploads, teardown lag
+    "instance_idle_seconds": instance_seconds - seconds_by_kind["busy"] if instance_seconds else None,
+    "utilization": seconds_by_kind["busy"] / instance_seconds if instance_seconds else None,
+    "bytes_up": sum(t["bytes"] for t in transfers if t["direction"] == "up"),
+    "bytes_down": sum(t["bytes"] for t in transfers if t["direction"] == "down"),
+    "cpu_avg_pct": sum(u["cpu_pct"] for u in usage_samples) / len(usage_samples) if usage_samples else None,
+    "cpu_max_pct": max((u["cpu_pct"] for u in usage_samples), default=None),
+    "mem_max_mb": max((u["mem_used_mb"] for u in usage_samples), default=None),
+    "mem_total_mb": usage_samples[-1]["mem_total_mb"] if usage_samples else None,
+}
+
+# ---------------------------------------------------------------------------
+# Write accounting.json locally and store summary in DB
+# ---------------------------------------------------------------------------
+
+accounting = {**run, "summary": summary, "stages": stages, "transfers": transfers, "usage_samples": usage_samples}
+local_accounting_path.write_text(json.dumps(accounting, indent=2))
+
+conn.execute("DELETE FROM dumps WHERE category = 'json' AND name = 'accounting_summary'")
+conn.execute("INSERT INTO dumps VALUES ('json', 'accounting_summary', ?)", (json.dumps(summary),))
+conn.commit()
+conn.close()
+
+print(json.dumps(summary, indent=2))
+print(f"accounting.json written to: {local_accounting_path}")
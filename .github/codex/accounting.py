@@ -0,0 +1,74 @@
+"""
+Run accounting helpers shared by the pipeline scripts.
+
+MUST HAVE REQUIREMENTS:
+- Tables stages, transfers, usage_samples (created by 001_init_db.py)
+- timed_stage(): record stage start/end/returncode with a kind:
+  local (no instance involved), idle (instance up, not reviewing), busy (codex running), session (debug)
+- record_transfer(): bytes moved between runner and instance
+- sampled_cmd(): wrap a remote command with a /proc sampler writing workdir/usage.log every 5s
+- record_usage(): parse usage.log into CPU % and memory samples
+"""
+
+import sqlite3, time
+from contextlib import contextmanager
+
+# ---------------------------------------------------------------------------
+# Stage timing
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def timed_stage(db_path, stage, kind):
+    started = time.time()
+    returncode = 0
+    try:
+        yield
+    except BaseException as e:
+        returncode = getattr(e, "returncode", None) or 1
+        raise
+    finally:
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO stages VALUES (?, ?, ?, ?, ?)", (stage, kind, started, time.time(), returncode))
+        conn.commit()
+        conn.close()
+
+# ---------------------------------------------------------------------------
+# Transfer volumes (direction: up = runner → instance, down = instance → runner)
+# ---------------------------------------------------------------------------
+
+def record_transfer(db_path, stage, direction, n_bytes):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO transfers VALUES (?, ?, ?)", (stage, direction, n_bytes))
+    conn.commit()
+    conn.close()
+
+# ---------------------------------------------------------------------------
+# Remote CPU / memory sampling during the codex run
+# usage.log line: epoch user nice system idle iowait irq softirq steal MemTotal_kB MemAvailable_kB
+# ---------------------------------------------------------------------------
+
+SAMPLER = (
+    "while :; do set -- $(head -1 /proc/stat); "
+    "echo \"$(date +%s) $2 $3 $4 $5 $6 $7 $8 $9 $(awk '/^MemTotal|^MemAvailable/ {printf \"%s \", $2}' /proc/meminfo)\"; "
+    "sleep 5; done"
+)
+
+
+def sampled_cmd(workdir, cmd):
+    return f"cd {workdir} || exit 1; ({SAMPLER}) > usage.log 2>&1 & sampler=$!; {cmd}; rc=$?; kill $sampler; exit $rc"
+
+
+def record_usage(db_path, usage_log):
+    rows = [[int(v) for v in line.split()] for line in usage_log.splitlines() if len(line.split()) == 11]
+    samples = []
+    for prev, cur in zip(rows, rows[1:]):
+        total = sum(cur[1:9]) - sum(prev[1:9])
+        idle = (cur[4] + cur[5]) - (prev[4] + prev[5])
+        cpu_pct = 100.0 * (1 - idle / total) if total else 0.0
+        samples.append((cur[0], cpu_pct, (cur[9] - cur[10]) / 1024, cur[9] / 1024))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO usage_samples VALUES (?, ?, ?, ?)", samples)
+    conn.commit()
+    conn.close()
+    return len(samples)
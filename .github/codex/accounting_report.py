@@ -0,0 +1,69 @@
+"""
+Utilization summary across runs from accounting.json files.
+
+MUST HAVE REQUIREMENTS:
+- Read accounting.json files written by 010_export_accounting.py (files or directories,
+  e.g. the output of `gh run download -p 'accounting-*'`)
+- Print one line per run and totals grouped by backend and instance type:
+  instance hours, busy %, idle instance hours, transfer volume, remote CPU and memory
+
+Usage: uv run accounting_report.py path/to/artifacts [more paths...]
+"""
+
+import json, sys
+from collections import defaultdict
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Load runs
+# ---------------------------------------------------------------------------
+
+paths = []
+for arg in sys.argv[1:]:
+    path = Path(arg)
+    paths += sorted(path.rglob("accounting.json")) if path.is_dir() else [path]
+
+runs = [json.loads(path.read_text()) for path in paths]
+if not runs:
+    raise SystemExit("No accounting.json files found")
+
+def fmt(value, spec):
+    return format(value, spec) if value is not None else "-".rjust(int(spec.split(".")[0]))
+
+# ---------------------------------------------------------------------------
+# Per-run lines
+# ---------------------------------------------------------------------------
+
+print(f"{'run_id':<16} {'pr':>5} {'backend':<7} {'type':<10} {'inst_min':>8} {'busy_min':>8} {'util':>5} {'MB_up':>7} {'MB_down':>7} {'cpu_avg':>7} {'mem_max':>7}")
+for run in runs:
+    s = run["summary"]
+    print(
+        f"{run.get('run_id', ''):<16} {run.get('pr_number', ''):>5} {run.get('selected_backend') or '':<7} {run.get('instance_type') or '':<10} "
+        f"{fmt(s['instance_seconds'] and s['instance_seconds'] / 60, '8.1f')} {s['busy_seconds'] / 60:8.1f} {fmt(s['utilization'], '5.0%')} "
+        f"{s['bytes_up'] / 1e6:7.2f} {s['bytes_down'] / 1e6:7.2f} {fmt(s['cpu_avg_pct'] and s['cpu_avg_pct'] / 100, '7.1%')} {fmt(s['mem_max_mb'], '7.0f')}"
+    )
+
+# ---------------------------------------------------------------------------
+# Totals by backend and instance type
+# ---------------------------------------------------------------------------
+
+groups = defaultdict(list)
+for run in runs:
+    groups[(run.get("selected_backend") or "ec2", run.get("instance_type") or "-")].append(run["summary"])
+
+print()
+print(f"{'backend':<7} {'type':<10} {'runs':>4} {'inst_h':>7} {'busy_h':>7} {'idle_h':>7} {'util':>5} {'MB_moved':>9} {'cpu_avg':>7} {'mem_peak':>13}")
+for (backend, instance_type), summaries in sorted(groups.items()):
+    instance_hours = sum(s["instance_seconds"] or 0 for s in summaries) / 3600
+    busy_hours = sum(s["busy_seconds"] for s in summaries) / 3600
+    idle_hours = sum(s["instance_idle_seconds"] or 0 for s in summaries) / 3600
+    moved_mb = sum(s["bytes_up"] + s["bytes_down"] for s in summaries) / 1e6
+    cpu_values = [s["cpu_avg_pct"] for s in summaries if s["cpu_avg_pct"] is not None]
+    mem_peak = max((s["mem_max_mb"] for s in summaries if s["mem_max_mb"] is not None), default=None)
+    mem_total = max((s["mem_total_mb"] for s in summaries if s["mem_total_mb"] is not None), default=None)
+    print(
+        f"{backend:<7} {instance_type:<10} {len(summaries):>4} {instance_hours:7.2f} {busy_hours:7.2f} {idle_hours:7.2f} "
+        f"{fmt(busy_hours / instance_hours if instance_hours else None, '5.0%')} {moved_mb:9.2f} "
+        f"{fmt(sum(cpu_values) / len(cpu_values) / 100 if cpu_values else None, '7.1%')} "
+        f"{fmt(mem_peak, '6.0f')}/{fmt(mem_total, '6.0f')}"
+    )
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Unpack the user data payload written by 002_aws_launch_spot.py --user-data.
+
+MUST HAVE REQUIREMENTS:
+- Installed on the AMI as /usr/local/bin/codex-boot-hook (root, mode 755)
+- Read gzip+base64 JSON payload from stdin (cloud-init runs the user data script as root)
+- Write payload files owned by ubuntu, create workdir and ~/.codex/
+- Payload holds auth.json and the GitHub token (inside AGENTS.md/prompt.txt): after unpacking,
+  delete cloud-init's on-disk copies of the user data (IMDS still serves it; codex has the
+  same credentials as files in workdir anyway, see SECURITY in 002_aws_launch_spot.py)
+- If payload has a run command, start it as ubuntu in workdir, log to workdir/codex.log
+- Report progress on the console: CODEX_BOOT_HOOK unpacked | started | finished <rc> | failed
+  (the background child reports failed too if it cannot run codex)
+
+Install: sudo install -m 755 codex_boot_hook.py /usr/local/bin/codex-boot-hook
+"""
+
+import base64, glob, gzip, json, os, pwd, subprocess, sys
+
+# ---------------------------------------------------------------------------
+# Console reporting (read by 002_aws_launch_spot.py and 007_ssh_run_codex.py)
+# ---------------------------------------------------------------------------
+
+def report(status):
+    line = f"CODEX_BOOT_HOOK {status}\n"
+    try:
+        with open("/dev/console", "w") as console:
+            console.write(line)
+    except OSError:
+        pass
+    sys.stdout.write(line)
+    sys.stdout.flush()
+
+# ---------------------------------------------------------------------------
+# Decode payload and write files
+# ---------------------------------------------------------------------------
+
+ubuntu = pwd.getpwnam("ubuntu")
+
+try:
+    payload = json.loads(gzip.decompress(base64.b64decode(sys.stdin.read())))
+
+    for path, content in payload["files"].items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        os.chmod(path, 0o600)
+
+    # Hand every created directory up to /home/ubuntu over to ubuntu
+    for path in [payload["workdir"]] + list(payload["files"]):
+        while path.startswith("/home/ubuntu/"):
+            os.chown(path, ubuntu.pw_uid, ubuntu.pw_gid)
+            path = os.path.dirname(path)
+except Exception as e:
+    print(f"Payload unpack failed: {e}", file=sys.stderr)
+    report("failed")
+    sys.exit(1)
+
+# ---------------------------------------------------------------------------
+# Scrub user data copies cloud-init caches on disk
+# ---------------------------------------------------------------------------
+
+try:
+    for path in glob.glob("/var/lib/cloud/instance/user-data.txt*") + glob.glob("/var/lib/cloud/instance/scripts/part-*") + ["/var/lib/cloud/instance/obj.pkl"]:
+        if os.path.exists(path):
+            os.unlink(path)
+except Exception as e:
+    print(f"User data scrub failed: {e}", file=sys.stderr)
+    report("failed")
+    sys.exit(1)
+
+report("unpacked")
+
+# ---------------------------------------------------------------------------
+# Start codex in the background so cloud-init can finish
+# ---------------------------------------------------------------------------
+
+if not payload.get("run"):
+    sys.exit(0)
+
+if os.fork():
+    report("started")
+    sys.exit(0)
+
+os.setsid()
+devnull = os.open(os.devnull, os.O_RDWR)
+for fd in (0, 1, 2):
+    os.dup2(devnull, fd)
+
+# The pipeline waits for a final report, so the child must always send one
+try:
+    with open(os.path.join(payload["workdir"], "codex.log"), "w") as log:
+        os.chown(log.name, ubuntu.pw_uid, ubuntu.pw_gid)
+        result = subprocess.run(
+            ["sudo", "-u", "ubuntu", "-H", "bash", "-lc", f"cd {payload['workdir']} && {payload['run']}"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT
+        )
+    report(f"finished {result.returncode}")
+except BaseException:
+    report("failed")
+    raise
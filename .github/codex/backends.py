@@ -0,0 +1,208 @@
+"""
+Execution backends for the codex stage.
+
+MUST HAVE REQUIREMENTS:
+- Common interface: provision → upload → run → download → teardown
+- Ec2Backend: spot instance driven by the numbered scripts (002, 003, 006, 007, 008, 009),
+  the 008 output download is best effort
+- LocalBackend: run the rendered AGENTS.md/prompt.txt on the runner inside a container
+  (local_container_image, required) that only sees the workdir and its own home; codex runs with
+  its sandbox bypassed, so it must never share a filesystem with db.sqlite3 and its secrets
+- select_backend(): backend from config ("ec2", "local" or "auto");
+  "auto" sends PRs with additions + deletions <= local_max_diff_lines to local,
+  or to ec2 when no local_container_image is configured
+- Rendering (004, 005) happens before any backend, output is in tmp/
+"""
+
+import json, os, shutil, sqlite3, subprocess, sys, tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from accounting import timed_stage
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def read_config(db_path, keys):
+    conn = sqlite3.connect(db_path)
+    placeholders = ", ".join("?" for _ in keys)
+    cursor = conn.execute(f"SELECT key, value FROM config WHERE key IN ({placeholders})", list(keys))
+    config = dict(cursor.fetchall())
+    conn.close()
+    return config
+
+
+def write_config(db_path, key, value):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)", (key, value))
+    conn.commit()
+    conn.close()
+
+
+# Accounting kind per stage, anything else is instance overhead ("idle")
+STAGE_KINDS = {
+    "004_write_agents.py": "local",
+    "005_write_prompt.py": "local",
+    "007_ssh_run_codex.py": "busy",
+    "debug_session.py": "session",
+}
+
+
+def run_script(db_path, script, *extra_args):
+    print(f"=== Running {script} ===")
+    with timed_stage(db_path, script, STAGE_KINDS.get(script, "idle")):
+        subprocess.run([sys.executable, script, "--db", str(db_path)] + list(extra_args), check=True)
+
+# ---------------------------------------------------------------------------
+# Backend interface
+# ---------------------------------------------------------------------------
+
+class Backend(ABC):
+    name = None
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    @abstractmethod
+    def provision(self): ...
+
+    @abstractmethod
+    def upload(self): ...
+
+    @abstractmethod
+    def run(self): ...
+
+    @abstractmethod
+    def download(self): ...
+
+    @abstractmethod
+    def teardown(self): ...
+
+# ---------------------------------------------------------------------------
+# EC2 spot instance over SSH (or user data, see 002_aws_launch_spot.py)
+# ---------------------------------------------------------------------------
+
+class Ec2Backend(Backend):
+    name = "ec2"
+
+    def __init__(self, db_path, autostart=True):
+        super().__init__(db_path)
+        self.autostart = autostart
+        self.user_data = read_config(db_path, ["payload_delivery"]).get("payload_delivery") == "user_data"
+
+    def provision(self):
+        if self.user_data:
+            run_script(self.db_path, "002_aws_launch_spot.py", "--user-data", *(["--autostart"] if self.autostart else []))
+            if not self.autostart:
+                run_script(self.db_path, "003_ssh_wait.py")
+        else:
+            run_script(self.db_path, "002_aws_launch_spot.py")
+            run_script(self.db_path, "003_ssh_wait.py")
+
+    def upload(self):
+        if not self.user_data:
+            run_script(self.db_path, "006_rsync_to_ec2.py")
+
+    def run(self):
+        run_script(self.db_path, "007_ssh_run_codex.py")
+
+    def download(self):
+        # Best effort: the review is already posted, a failed pull must not fail the run
+        try:
+            run_script(self.db_path, "008_rsync_from_ec2.py", "--outputs-only")
+        except subprocess.CalledProcessError as e:
+            print(f"Warning: output download failed ({e}), continuing to teardown")
+
+    def teardown(self):
+        run_script(self.db_path, "009_ssh_poweroff.py")
+
+# ---------------------------------------------------------------------------
+# Local runner: no launch, no SSH, container only
+# ---------------------------------------------------------------------------
+
+class LocalBackend(Backend):
+    name = "local"
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        config = read_config(db_path, ["repo_name", "pr_number", "codex_exec", "codex_auth_json", "local_container_image"])
+        if not config.get("local_container_image"):
+            raise SystemExit("Local backend needs local_container_image: codex runs unsandboxed and must not see the runner")
+        self.config = config
+        # Outside the checkout, so nothing next to db.sqlite3 is ever mounted
+        self.root = Path(tempfile.mkdtemp(prefix="codex-local-"))
+        self.workdir = self.root / config["repo_name"] / config["pr_number"]
+        self.home = self.root / "home"
+
+    def provision(self):
+        self.workdir.mkdir(parents=True, exist_ok=True)
+        (self.home / ".codex").mkdir(parents=True, exist_ok=True)
+        write_config(self.db_path, "local_workdir", str(self.workdir))
+        print(f"Local workdir: {self.workdir}")
+
+    def upload(self):
+        for name in ["AGENTS.md", "prompt.txt"]:
+            shutil.copy(Path("tmp") / name, self.workdir / name)
+        auth_json_path = self.home / ".codex" / "auth.json"
+        auth_json_path.write_text(self.config["codex_auth_json"])
+        auth_json_path.chmod(0o600)
+
+    def run(self):
+        codex_cmd = f"cat prompt.txt | {self.config['codex_exec']}"
+
+        # Only workdir and home are mounted, no runner env or capabilities are passed in;
+        # runs as the runner uid so the mounted files (auth.json is 0600) stay readable
+        cmd = ["docker", "run", "--rm", "--cap-drop", "ALL", "--security-opt", "no-new-privileges",
+               "--user", f"{os.getuid()}:{os.getgid()}",
+               "-v", f"{self.workdir}:/work", "-v", f"{self.home}:/home/codex",
+               "-e", "HOME=/home/codex", "-e", "CODEX_HOME=/home/codex/.codex",
+               "-w", "/work", self.config["local_container_image"], "sh", "-c", codex_cmd]
+
+        print(f"Running codex locally in {self.config['local_container_image']} ({self.workdir})...")
+        with timed_stage(self.db_path, "local_codex", "busy"):
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        print(f"STDOUT:\n{result.stdout}")
+        print(f"STDERR:\n{result.stderr}")
+        if result.returncode != 0:
+            raise SystemExit(f"Codex failed with exit code {result.returncode}")
+        print("Codex execution complete")
+
+    def download(self):
+        for path in self.workdir.iterdir():
+            if path.is_file():
+                shutil.copy(path, Path("tmp") / path.name)
+        print("Downloaded to: tmp")
+
+    def teardown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        print(f"Removed {self.root}")
+
+# ---------------------------------------------------------------------------
+# Routing
+# ---------------------------------------------------------------------------
+
+def select_backend(db_path):
+    config = read_config(db_path, ["backend", "local_max_diff_lines", "local_container_image"])
+    backend = config.get("backend", "ec2")
+
+    if backend == "auto":
+        conn = sqlite3.connect(db_path)
+        cursor = conn.execute("SELECT content FROM dumps WHERE category = 'json' AND name = 'github'")
+        github_raw = cursor.fetchone()[0]
+        github_ctx = json.loads(github_raw.decode() if isinstance(github_raw, bytes) else github_raw)
+        conn.close()
+
+        # No container image → no safe local run; workflow_dispatch has no pull_request
+        # payload, so size is unknown → ec2
+        pull_request = github_ctx.get("event", {}).get("pull_request", {})
+        if not config.get("local_container_image"):
+            backend = "ec2"
+        elif "additions" in pull_request:
+            diff_lines = pull_request["additions"] + pull_request["deletions"]
+            backend = "local" if diff_lines <= int(config.get("local_max_diff_lines", 200)) else "ec2"
+            print(f"Diff size: {diff_lines} lines → {backend} backend")
+        else:
+            backend = "ec2"
+
+    write_config(db_path, "selected_backend", backend)
+    return LocalBackend(db_path) if backend == "local" else Ec2Backend(db_path)
@@ -0,0 +1,148 @@
+"""
+Keep a debug instance alive only while it is being used.
+
+MUST HAVE REQUIREMENTS:
+- Read public_ip, ssh_private_key, workdir, debug_idle_minutes, debug_max_minutes from DB
+- watch: poll the instance for SSH sessions, workdir changes and control commands,
+  extend the lease on activity, return when the lease expires, on "end", or at debug_max_minutes
+- Arm `shutdown -h` on the instance at lease expiry so it powers off even if the runner dies
+- extend MINUTES / end: queue a control command on the instance (~/.codex-debug/control)
+- Write debug_lease_until and debug_end_reason to DB
+
+Usage:
+  uv run debug_session.py --db db.sqlite3 watch
+  uv run debug_session.py --db db.sqlite3 extend 60
+  uv run debug_session.py --db db.sqlite3 end
+"""
+
+import sqlite3, subprocess, tempfile, os, sys, time, math
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Arguments: --db <path> <watch | extend MINUTES | end>
+# ---------------------------------------------------------------------------
+
+usage = "Usage: uv run debug_session.py --db db.sqlite3 <watch | extend MINUTES | end>"
+if len(sys.argv) < 4 or sys.argv[3] not in ("watch", "extend", "end"):
+    raise SystemExit(usage)
+if sys.argv[3] == "extend" and (len(sys.argv) < 5 or not sys.argv[4].isdigit()):
+    raise SystemExit(usage)
+
+db_path = Path(sys.argv[2])
+command = sys.argv[3]
+
+# ---------------------------------------------------------------------------
+# Read config from DB
+# ---------------------------------------------------------------------------
+
+conn = sqlite3.connect(db_path)
+cursor = conn.cursor()
+
+cursor.execute("SELECT key, value FROM config WHERE key IN ('public_ip', 'ssh_private_key', 'workdir', 'debug_idle_minutes', 'debug_max_minutes')")
+config = dict(cursor.fetchall())
+
+idle_seconds = int(config.get("debug_idle_minutes") or 30) * 60
+max_seconds = int(config.get("debug_max_minutes") or 350) * 60
+poll_seconds = 60
+rearm_seconds = 5 * 60
+
+# ---------------------------------------------------------------------------
+# Write key to temp file
+# ---------------------------------------------------------------------------
+
+key_fd, key_path = tempfile.mkstemp()
+os.write(key_fd, config["ssh_private_key"].encode())
+os.close(key_fd)
+os.chmod(key_path, 0o600)
+
+ssh_cmd = ["ssh", "-o", "StrictHostKeyChecking=no", "-o", "ConnectTimeout=10", "-i", key_path, f"ubuntu@{config['public_ip']}"]
+
+# ---------------------------------------------------------------------------
+# extend / end: queue a control command for the watcher
+# ---------------------------------------------------------------------------
+
+if command in ("extend", "end"):
+    line = f"extend {int(sys.argv[4])}" if command == "extend" else "end"
+    subprocess.run(ssh_cmd + [f"mkdir -p ~/.codex-debug && echo '{line}' >> ~/.codex-debug/control"], check=True)
+    os.unlink(key_path)
+    print(f"Queued '{line}', applied at the next watcher poll (within {poll_seconds}s)")
+    exit(0)
+
+# ---------------------------------------------------------------------------
+# watch: one SSH call per poll reports sessions, newest workdir mtime and queued commands
+# (the probe's own session is the one "sshd: ubuntu@notty" it subtracts)
+# ---------------------------------------------------------------------------
+
+probe_cmd = (
+    "echo sessions $(( $(pgrep -cf '^sshd(-session)?: ubuntu@') - 1 )); "
+    f"echo mtime $(find {config['workdir']} -printf '%T@\\n' 2>/dev/null | sort -n | tail -1 | cut -d. -f1); "
+    "mkdir -p ~/.codex-debug; touch ~/.codex-debug/control; "
+    "sed 's/^/control /' ~/.codex-debug/control; : > ~/.codex-debug/control"
+)
+
+def arm_shutdown(seconds):
+    minutes = max(1, math.ceil(seconds / 60))
+    subprocess.run(ssh_cmd + [f"sudo shutdown --no-wall -h +{minutes}"], capture_output=True)
+
+started = time.time()
+lease_until = started + idle_seconds
+armed_until = None
+last_mtime = 0
+end_reason = None
+
+print(f"=== Debug session: idle window {idle_seconds // 60} min, max {max_seconds // 60} min ===")
+print(f"EC2 IP: {config['public_ip']}")
+print(f"Extend with: uv run debug_session.py --db {db_path} extend 60 (or on the instance: echo 'extend 60' >> ~/.codex-debug/control)")
+print(f"End with: uv run debug_session.py --db {db_path} end")
+
+while end_reason is None:
+    result = subprocess.run(ssh_cmd + [probe_cmd], capture_output=True, text=True)
+    now = time.time()
+    sessions, mtime, controls = 0, 0, []
+    for line in result.stdout.splitlines():
+        name, _, value = line.partition(" ")
+        if name == "sessions":
+            sessions = max(0, int(value))
+        elif name == "mtime" and value:
+            mtime = int(value)
+        elif name == "control":
+            if value.split():
+                controls.append(value.split())
+
+    # Activity: open SSH sessions or files touched in workdir since the last poll
+    active = sessions > 0 or mtime > last_mtime > 0
+    last_mtime = max(last_mtime, mtime)
+    if active:
+        lease_until = max(lease_until, now + idle_seconds)
+
+    for control in controls:
+        if control[0] == "extend" and len(control) == 2 and control[1].isdigit():
+            lease_until = max(lease_until, now + int(control[1]) * 60)
+        elif control[0] == "end":
+            end_reason = "ended"
+
+    if lease_until > started + max_seconds:
+        lease_until = started + max_seconds
+
+    if end_reason is None and now >= lease_until:
+        end_reason = "max_duration" if lease_until >= started + max_seconds else "idle"
+
+    # Dead-man switch: one poll of slack so the watcher (and 009) normally gets there first, plus
+    # rearm_seconds so it is only re-armed when the lease moved by more than that, not on every poll
+    if end_reason is None and (armed_until is None or abs(lease_until - armed_until) > rearm_seconds):
+        arm_shutdown(lease_until + poll_seconds + rearm_seconds - now)
+        armed_until = lease_until
+
+    cursor.execute("INSERT OR REPLACE INTO config (key, value) VALUES ('debug_lease_until', ?)", (str(int(lease_until)),))
+    conn.commit()
+
+    print(f"sessions={sessions} active={active} lease_left={int(lease_until - now) // 60}min")
+    if end_reason is None:
+        time.sleep(poll_seconds)
+
+cursor.execute("INSERT OR REPLACE INTO config (key, value) VALUES ('debug_end_reason', ?)", (end_reason,))
+conn.commit()
+conn.close()
+
+os.unlink(key_path)
+print(f"=== Debug session over ({end_reason}) ===")
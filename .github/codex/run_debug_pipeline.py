@@ -4,11 +4,13 @@ Run debug pipeline scripts in order.
 MUST HAVE REQUIREMENTS:
 - Execute list of scripts sequentially using subprocess
 - Pass --db argument to each script
-- Order: aws_launch_spot → ssh_wait → write_agents → write_prompt → rsync → sleep 6h
-- Same as prod but sleep instead of codex
+- Order: write_agents → write_prompt → aws_launch_spot → ssh_wait → rsync → debug_session watch
+- Same as prod on the EC2 backend but an idle-aware debug session instead of codex
+- payload_delivery = user_data: write_agents → write_prompt → aws_launch_spot --user-data → ssh_wait → debug_session watch
 """
 
-import subprocess, sys, time, sqlite3
+import sqlite3
+from backends import Ec2Backend, run_script
 
 # ---------------------------------------------------------------------------
 # Paths (relative, script runs from .github/codex/)
@@ -17,24 +19,15 @@ import subprocess, sys, time, sqlite3
 db_path = "db.sqlite3"
 
 # ---------------------------------------------------------------------------
-# Scripts to run in order (matches debug_flow.d2)
+# Render, provision and upload on EC2 without starting codex (matches debug_flow.d2)
 # ---------------------------------------------------------------------------
 
-scripts = [
-    "002_aws_launch_spot.py",
-    "003_ssh_wait.py",
-    "004_write_agents.py",
-    "005_write_prompt.py",
-    "006_rsync_to_ec2.py",
-]
+run_script(db_path, "004_write_agents.py")
+run_script(db_path, "005_write_prompt.py")
 
-# ---------------------------------------------------------------------------
-# Run each script with --db argument
-# ---------------------------------------------------------------------------
-
-for script in scripts:
-    print(f"=== Running {script} ===")
-    subprocess.run([sys.executable, script, "--db", db_path], check=True)
+backend = Ec2Backend(db_path, autostart=False)
+backend.provision()
+backend.upload()
 
 # ---------------------------------------------------------------------------
 # Get IP from DB for user to copy
@@ -43,19 +36,14 @@ for script in scripts:
 conn = sqlite3.connect(db_path)
 cursor = conn.execute("SELECT value FROM config WHERE key = 'public_ip'")
 public_ip = cursor.fetchone()[0]
-cursor = conn.execute("SELECT value FROM config WHERE key = 'repo_name'")
-repo_name = cursor.fetchone()[0]
-cursor = conn.execute("SELECT value FROM config WHERE key = 'pr_number'")
-pr_number = cursor.fetchone()[0]
 conn.close()
 
 # ---------------------------------------------------------------------------
-# Sleep 6 hours to keep GitHub token active
+# Keep instance (and GitHub token) alive while the session is in use
 # ---------------------------------------------------------------------------
 
-print("=== Sleeping 6 hours (token active for local testing) ===")
 print(f"EC2 IP: {public_ip}")
-print(f"Download with: cd .github/codex && uv run 008_rsync_from_ec2.py --db {db_path}")
-time.sleep(21600)
+print(f"Download with: cd .github/codex && uv run 008_rsync_from_ec2.py --db {db_path} --outputs-only")
+run_script(db_path, "debug_session.py", "watch")
 
 print("=== Debug pipeline complete ===")
@@ -2,12 +2,13 @@
 Run pipeline scripts in order.
 
 MUST HAVE REQUIREMENTS:
-- Execute list of scripts sequentially using subprocess
-- Pass --db argument to each script
-- Order: aws_launch_spot → ssh_wait → write_agents → write_prompt → rsync → codex
+- Render AGENTS.md and prompt.txt (write_agents → write_prompt)
+- Pick execution backend (backends.select_backend: ec2, local or auto by diff size)
+- Order: provision → upload → run → download (outputs to tmp/), teardown always
+- ec2: aws_launch_spot → ssh_wait → rsync → codex (user_data: aws_launch_spot --user-data --autostart → codex)
 """
 
-import subprocess, sys
+from backends import run_script, select_backend
 
 # ---------------------------------------------------------------------------
 # Paths (relative, script runs from .github/codex/)
@@ -16,26 +17,25 @@ import subprocess, sys
 db_path = "db.sqlite3"
 
 # ---------------------------------------------------------------------------
-# Scripts to run in order (matches prod_flow.d2)
+# Render templates (same for every backend)
 # ---------------------------------------------------------------------------
 
-scripts = [
-    "002_aws_launch_spot.py",
-    "003_ssh_wait.py",
-    "004_write_agents.py",
-    "005_write_prompt.py",
-    "006_rsync_to_ec2.py",
-    "007_ssh_run_codex.py",
-]
+run_script(db_path, "004_write_agents.py")
+run_script(db_path, "005_write_prompt.py")
 
 # ---------------------------------------------------------------------------
-# Run each script with --db argument
+# Run codex on the selected backend (matches prod_flow.d2)
 # ---------------------------------------------------------------------------
 
-for script in scripts:
-    print(f"=== Running {script} ===")
-    subprocess.run([sys.executable, script, "--db", db_path], check=True)
+backend = select_backend(db_path)
+print(f"=== Backend: {backend.name} ===")
 
-print("=== Pipeline complete ===")
+try:
+    backend.provision()
+    backend.upload()
+    backend.run()
+    backend.download()
+finally:
+    backend.teardown()
 
-# E2E test change - can be removed
+print("=== Pipeline complete ===")
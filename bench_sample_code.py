@@ -0,0 +1,73 @@
+# bench_sample_code.py
+# Compares the per-order sample_code path with the batch path on generated orders.
+# Usage:
+#   python bench_sample_code.py [n_orders] [items_per_order]
+
+import contextlib, csv, io, os, sys, tempfile, time
+
+import numpy as np
+
+from sample_code import process_order, process_orders_batch, process_orders_csv
+
+
+def generate_orders(n_orders, items_per_order, seed=0):
+    rng = np.random.default_rng(seed)
+    n_rows = n_orders * items_per_order
+    order_ids = np.repeat(np.arange(n_orders, dtype=np.int64), items_per_order)
+    prices = np.round(rng.uniform(1, 60, n_rows), 2)
+    qtys = rng.integers(1, 5, n_rows).astype(np.float64)
+    return order_ids, prices, qtys
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def build_orders(order_ids, prices, qtys, items_per_order):
+    return [
+        [{'price': p, 'qty': q} for p, q in zip(prices[i:i + items_per_order].tolist(), qtys[i:i + items_per_order].tolist())]
+        for i in range(0, len(order_ids), items_per_order)
+    ]
+
+
+def run_per_order(orders):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return np.array([process_order(items) for items in orders])
+
+
+def run_csv(order_ids, prices, qtys):
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['order_id', 'price', 'qty'])
+        writer.writerows(zip(order_ids.tolist(), prices.tolist(), qtys.tolist()))
+    try:
+        chunk_finals, csv_seconds = timed(lambda: [finals for _, _, _, finals in process_orders_csv(path)])
+    finally:
+        os.unlink(path)
+    return np.concatenate(chunk_finals), csv_seconds
+
+
+def main():
+    n_orders = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    items_per_order = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    order_ids, prices, qtys = generate_orders(n_orders, items_per_order)
+
+    # Input conversion stays out of the timed region; print I/O stays in
+    orders = build_orders(order_ids, prices, qtys, items_per_order)
+    per_order_finals, per_order_seconds = timed(lambda: run_per_order(orders))
+    (_, _, _, batch_finals), batch_seconds = timed(lambda: process_orders_batch(order_ids, prices, qtys))
+    csv_finals, csv_seconds = run_csv(order_ids, prices, qtys)
+
+    assert np.allclose(per_order_finals, batch_finals) and np.allclose(batch_finals, csv_finals)
+
+    print(f"{n_orders} orders x {items_per_order} items")
+    print(f"per-order:   {per_order_seconds:8.3f}s")
+    print(f"batch:       {batch_seconds:8.3f}s  ({per_order_seconds / batch_seconds:.1f}x)")
+    print(f"batch (csv): {csv_seconds:8.3f}s  (includes parsing)")
+
+
+if __name__ == "__main__":
+    main()
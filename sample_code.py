@@ -1,3 +1,7 @@
+from itertools import islice
+
+import numpy as np
+
 def calculate_total(items):
     total = 0
     for item in items:
@@ -16,3 +20,53 @@ def process_order(items):
     final = total - discount
     print(f"Total: {total}, Discount: {discount}, Final: {final}")
     return final
+
+# Batch path: one row per line item (order_id, price, qty), no per-order printing
+
+def calculate_totals_batch(order_ids, prices, qtys):
+    order_ids = np.asarray(order_ids)
+    line_totals = np.asarray(prices, dtype=np.float64) * np.asarray(qtys, dtype=np.float64)
+    unique_ids, order_index = np.unique(order_ids, return_inverse=True)
+    totals = np.bincount(order_index, weights=line_totals, minlength=len(unique_ids))
+    return unique_ids, totals
+
+def get_discount_batch(totals):
+    return np.where(totals > 100, totals * 0.1, 0.0)
+
+def process_orders_batch(order_ids, prices, qtys):
+    unique_ids, totals = calculate_totals_batch(order_ids, prices, qtys)
+    discounts = get_discount_batch(totals)
+    return unique_ids, totals, discounts, totals - discounts
+
+def process_orders_csv(path, chunk_rows=1_000_000):
+    # CSV with header order_id,price,qty, sorted by integer order id (so rows of one
+    # order are contiguous): the last order of each chunk is held back until the next
+    # chunk so it is never split, keeping memory at about chunk_rows rows.
+    # Unsorted order ids raise ValueError.
+    dtype = [('order_id', np.int64), ('price', np.float64), ('qty', np.float64)]
+    carry = np.empty(0, dtype=dtype)
+    last_id = None
+
+    def emit(rows):
+        nonlocal last_id
+        ids = rows['order_id']
+        if (last_id is not None and ids[0] <= last_id) or np.any(ids[1:] < ids[:-1]):
+            raise ValueError(f"{path}: order ids are not sorted")
+        last_id = ids[-1]
+        return process_orders_batch(ids, rows['price'], rows['qty'])
+
+    with open(path) as f:
+        next(f, None)
+        while lines := list(islice(f, chunk_rows)):
+            if not any(map(str.strip, lines)):
+                continue
+            rows = np.concatenate([carry, np.loadtxt(lines, delimiter=',', dtype=dtype, ndmin=1)])
+            if not len(rows):
+                continue
+            other_orders = np.flatnonzero(rows['order_id'] != rows['order_id'][-1])
+            split = other_orders[-1] + 1 if len(other_orders) else 0
+            carry = rows[split:]
+            if split:
+                yield emit(rows[:split])
+    if len(carry):
+        yield emit(carry)
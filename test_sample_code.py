@@ -0,0 +1,69 @@
+# test_sample_code.py
+# process_orders_csv must match process_order for any chunk size.
+# Usage:
+#   python -m pytest test_sample_code.py
+
+import numpy as np
+import pytest
+
+from sample_code import process_order, process_orders_csv
+
+ORDERS = {
+    1: [(60.0, 1), (30.0, 2), (0.5, 4)],
+    2: [(1.0, 1), (2.0, 1), (3.0, 1), (4.0, 1), (5.0, 1)],
+    3: [(10.0, 2), (5.5, 1)],
+    7: [(99.0, 1)],
+}
+
+
+def write_csv(path, rows, blank_lines=False):
+    lines = ["order_id,price,qty\n"]
+    for order_id, price, qty in rows:
+        lines.append(f"{order_id},{price},{qty}\n")
+        if blank_lines:
+            lines.append("\n")
+    path.write_text("".join(lines))
+
+
+def collect(path, chunk_rows):
+    ids, totals, discounts, finals = [], [], [], []
+    for batch_ids, batch_totals, batch_discounts, batch_finals in process_orders_csv(path, chunk_rows):
+        ids += batch_ids.tolist()
+        totals += batch_totals.tolist()
+        discounts += batch_discounts.tolist()
+        finals += batch_finals.tolist()
+    return ids, totals, discounts, finals
+
+
+@pytest.mark.parametrize("blank_lines", [False, True])
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 5, 100])
+def test_csv_matches_process_order(tmp_path, chunk_rows, blank_lines):
+    path = tmp_path / "orders.csv"
+    write_csv(path, [(order_id, price, qty) for order_id, items in ORDERS.items() for price, qty in items], blank_lines)
+
+    ids, _, _, finals = collect(path, chunk_rows)
+
+    assert sorted(ids) == sorted(ORDERS)
+    expected = {order_id: process_order([{'price': p, 'qty': q} for p, q in items]) for order_id, items in ORDERS.items()}
+    np.testing.assert_allclose([finals[ids.index(order_id)] for order_id in expected], list(expected.values()))
+
+
+def test_csv_empty_file(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text("")
+    assert collect(path, 2) == ([], [], [], [])
+
+    path.write_text("order_id,price,qty\n\n\n")
+    assert collect(path, 2) == ([], [], [], [])
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 100])
+@pytest.mark.parametrize("rows", [
+    [(1, 10.0, 1), (2, 20.0, 1), (1, 30.0, 1)],
+    [(2, 10.0, 1), (2, 20.0, 1), (1, 30.0, 1)],
+])
+def test_csv_rejects_unsorted_orders(tmp_path, chunk_rows, rows):
+    path = tmp_path / "orders.csv"
+    write_csv(path, rows)
+    with pytest.raises(ValueError):
+        collect(path, chunk_rows)